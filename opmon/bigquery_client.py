@@ -1,8 +1,15 @@
 """BigQuery handler."""
-from typing import Any, Dict, Iterable, List, Optional, Protocol, Union
+import logging
+import os
+import threading
+from functools import lru_cache, wraps
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Set, Union
 
 import attr
 from google.cloud import bigquery
+from google.cloud.exceptions import NotFound
+
+logger = logging.getLogger(__name__)
 
 
 class BeforeExecuteCallback(Protocol):
@@ -28,6 +35,75 @@ def sql_table_id(table):
     return f"{table.project}.{table.dataset_id}.{table.table_id}"
 
 
+DEFAULT_QUERY_CONCURRENCY = 5
+
+
+def _query_concurrency() -> int:
+    """Return the maximum number of concurrently executing queries.
+
+    Configured through the `OPMON_BQ_CONCURRENCY` environment variable; invalid
+    values fall back to the default and the limit is always at least 1.
+    """
+    value = os.environ.get("OPMON_BQ_CONCURRENCY")
+    if value is None:
+        return DEFAULT_QUERY_CONCURRENCY
+
+    try:
+        return max(1, int(value))
+    except ValueError:
+        logger.warning(
+            f"Invalid OPMON_BQ_CONCURRENCY value {value!r}, "
+            f"using {DEFAULT_QUERY_CONCURRENCY} instead"
+        )
+        return DEFAULT_QUERY_CONCURRENCY
+
+
+# limits how many queries are executed at the same time across all threads,
+# projects running in parallel otherwise compete for the same job slots.
+# This also caps the effective `--parallelism` of the CLI: with more projects
+# running in parallel than this limit, the remaining ones wait for a free slot.
+_BQ_SEMAPHORE = threading.BoundedSemaphore(_query_concurrency())
+
+
+def _limit_concurrency(func):
+    """Run the decorated function while holding the query concurrency semaphore."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with _BQ_SEMAPHORE:
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+# tables that are known to exist; only positive results are cached since
+# tables get created by the queries themselves, e.g. on the first backfill day
+_EXISTING_TABLES: Set[str] = set()
+
+
+def table_exists(client: bigquery.Client, table_id: str) -> bool:
+    """Check whether a BigQuery table exists, remembering tables that do."""
+    if table_id in _EXISTING_TABLES:
+        return True
+
+    try:
+        client.get_table(table_id, timeout=30)
+    except NotFound:
+        return False
+
+    _EXISTING_TABLES.add(table_id)
+    return True
+
+
+@lru_cache(maxsize=8)
+def _shared_client(project: str) -> bigquery.client.Client:
+    """Return a BigQuery client that is shared by all handlers for the project.
+
+    Creating a client looks up credentials and sets up a new HTTP session.
+    """
+    return bigquery.client.Client(project)
+
+
 @attr.s(auto_attribs=True, slots=True)
 class BigQueryClient:
     """Handler for requests to BigQuery."""
@@ -41,9 +117,10 @@ class BigQueryClient:
     @property
     def client(self) -> bigquery.client.Client:
         """Return BigQuery client instance."""
-        self._client = self._client or bigquery.client.Client(self.project)
+        self._client = self._client or _shared_client(self.project)
         return self._client
 
+    @_limit_concurrency
     def execute(
         self,
         query: Union[str, List[str]],
@@ -55,6 +132,7 @@ class BigQueryClient:
         dataset: Optional[str] = None,
         join_keys: Optional[List[str]] = None,
         annotations: Dict[str, Any] = {},
+        priority: Optional[str] = None,
     ) -> None:
         """Execute a SQL query and applies the provided parameters."""
         bq_dataset = bigquery.dataset.DatasetReference.from_string(
@@ -66,6 +144,10 @@ class BigQueryClient:
             "allow_large_results": True,
             "use_query_cache": False,
         }
+
+        if priority:
+            kwargs["priority"] = priority
+
         base_kwargs = kwargs.copy()
 
         if destination_table:
@@ -7,7 +7,7 @@ from datetime import datetime, time, timedelta
 from functools import partial
 from multiprocessing.pool import ThreadPool
 from pathlib import Path
-from typing import Iterable, Optional, Tuple
+from typing import Iterable, Optional, Set, Tuple
 
 import click
 import pytz
@@ -33,6 +33,9 @@ LOOKER_PREVIEW_URL = (
     "https://mozilla.cloud.looker.com/dashboards/operational_monitoring::opmon_preview"
 )
 
+# SQL output directories that have already been created in this process
+_CREATED_SQL_OUTPUT_DIRS: Set[str] = set()
+
 
 class ClickDate(click.ParamType):
     """Converter for click date string parameters to datetime."""
@@ -76,7 +79,11 @@ config_file_option = click.option(
 )
 
 parallelism_option = click.option(
-    "--parallelism", "-p", help="Number of processes to run monitoring analysis", default=8
+    "--parallelism",
+    "-p",
+    help="Number of processes to run monitoring analysis. At most OPMON_BQ_CONCURRENCY "
+    "(default 5) of them execute BigQuery queries at the same time.",
+    default=8,
 )
 
 sql_output_dir_option = click.option(
@@ -90,6 +97,13 @@ sql_output_dir_option = click.option(
     metavar="OUTDIR",
 )
 
+interactive_option = click.option(
+    "--interactive",
+    is_flag=True,
+    default=False,
+    help="Run queries with interactive instead of batch priority",
+)
+
 config_repos_option = click.option(
     "--config_repos",
     "--config-repos",
@@ -158,6 +172,7 @@ def cli(
 @config_repos_option
 @private_config_repos_option
 @sql_output_dir_option
+@interactive_option
 def run(
     project_id,
     dataset_id,
@@ -168,6 +183,7 @@ def run(
     config_repos,
     private_config_repos,
     sql_output_dir,
+    interactive,
 ):
     """Execute the monitoring ETL for a specific date."""
     ConfigLoader.with_configs_from(config_repos).with_configs_from(
@@ -262,6 +278,7 @@ def run(
         derived_dataset_id,
         date,
         before_execute_callback=partial(_before_execute_callback, sql_output_dir),
+        interactive=interactive,
     )
 
     success = False
@@ -282,6 +299,7 @@ def _run(
     submission_date: datetime,
     config: Tuple[str, MonitoringConfiguration],
     before_execute_callback: Optional[BeforeExecuteCallback] = None,
+    interactive: bool = False,
 ):
     """Execute by parallel processes."""
     monitoring = Monitoring(
@@ -291,6 +309,7 @@ def _run(
         slug=config[0],
         config=config[1],
         before_execute_callback=before_execute_callback,
+        interactive=interactive,
     )
     monitoring.run(submission_date)
     return True
@@ -313,9 +332,9 @@ def _before_execute_callback(sql_output_dir: Optional[str], query, job_config, a
     if "type" not in annotations:
         return
 
-    # We could avoid some IO by remembering what we've already created, but for
-    # now this will do.
-    Path(sql_output_dir).mkdir(parents=True, exist_ok=True)
+    if sql_output_dir not in _CREATED_SQL_OUTPUT_DIRS:
+        Path(sql_output_dir).mkdir(parents=True, exist_ok=True)
+        _CREATED_SQL_OUTPUT_DIRS.add(sql_output_dir)
 
     # The submission date is actually a datetime.
     submission_date = annotations["submission_date"].strftime("%Y-%m-%d")
@@ -363,6 +382,7 @@ def _before_execute_callback(sql_output_dir: Optional[str], query, job_config, a
 @config_repos_option
 @private_config_repos_option
 @sql_output_dir_option
+@interactive_option
 def backfill(
     project_id,
     dataset_id,
@@ -374,6 +394,7 @@ def backfill(
     config_repos,
     private_config_repos,
     sql_output_dir,
+    interactive,
 ):
     """Backfill a specific project."""
     ConfigLoader.with_configs_from(config_repos).with_configs_from(
@@ -471,6 +492,7 @@ def backfill(
                 date,
                 config,
                 before_execute_callback=partial(_before_execute_callback, sql_output_dir),
+                interactive=interactive,
             )
         except Exception as e:
             print(f"Error backfilling {config[0]}: {e}")
@@ -604,6 +626,8 @@ def preview(
         config_repos=config_repos,
         private_config_repos=private_config_repos,
         sql_output_dir=sql_output_dir,
+        # previews are waited on by the user, so don't queue them as batch jobs
+        interactive=True,
     )
 
     start_date_str = start_date.strftime("%Y-%m-%d")
@@ -37,7 +37,7 @@ def dry_run_query(sql: Union[str, List[str]]) -> None:
     """Dry run the provided SQL query."""
     if isinstance(sql, list):
         for query in sql:
-            dry_run_query(sql)
+            dry_run_query(query)
         return
     try:
         r = requests.post(
@@ -1,20 +1,16 @@
 """Metadata handler for opmon projects."""
 
-import os
-from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import attr
-from jinja2 import Environment, FileSystemLoader
 from metric_config_parser.monitoring import MonitoringConfiguration
 
-from opmon.bigquery_client import BigQueryClient
+from opmon.bigquery_client import BigQueryClient, table_exists
 from opmon.statistic import Summary
+from opmon.templates import jinja_env
 
-PATH = Path(os.path.dirname(__file__))
 PROJECTS_TABLE = "projects_v1"
 PROJECTS_FILENAME = "projects.sql"
-TEMPLATE_FOLDER = PATH / "templates"
 
 
 @attr.s(auto_attribs=True)
@@ -35,9 +31,7 @@ class Metadata:
 
     def _render_sql(self, template_file: str, render_kwargs: Dict[str, Any]):
         """Render and return the SQL from a template."""
-        file_loader = FileSystemLoader(TEMPLATE_FOLDER)
-        env = Environment(loader=file_loader)
-        template = env.get_template(template_file)
+        template = jinja_env().get_template(template_file)
         sql = template.render(**render_kwargs)
         return sql
 
@@ -46,12 +40,7 @@ class Metadata:
         destination_table = f"{self.project}.{self.derived_dataset}.{PROJECTS_TABLE}"
 
         # check if projects metadata table exists; otherwise it needs to be created
-        first_run = True
-        try:
-            self.bigquery.client.get_table(destination_table)
-            first_run = False
-        except Exception:
-            first_run = True
+        first_run = not table_exists(self.bigquery.client, destination_table)
 
         project_metadata: List[Dict[str, Any]] = []
 
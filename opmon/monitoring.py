@@ -1,29 +1,32 @@
 """Generate and run the Operational Monitoring Queries."""
 
-import itertools
+import logging
 import os
 import re
-from asyncio.log import logger
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Set, Union
 
 import attr
-from google import cloud
 from google.cloud import bigquery
-from jinja2 import Environment, FileSystemLoader
 from metric_config_parser.alert import AlertType
+from metric_config_parser.metric import Metric
 from metric_config_parser.monitoring import MonitoringConfiguration
 
-from opmon.platform import PLATFORM_CONFIGS
+from opmon.platform import Platform
 
 from . import errors
-from .bigquery_client import BeforeExecuteCallback, BigQueryClient
+from .bigquery_client import BeforeExecuteCallback, BigQueryClient, table_exists
 from .dryrun import dry_run_query
 from .logging import LogConfiguration
 from .statistic import Summary
+from .templates import SQL_TEMPLATES, jinja_env
 from .utils import bq_normalize_name
 
+logger = logging.getLogger(__name__)
+
 PATH = Path(os.path.dirname(__file__))
 
 METRIC_QUERY_FILENAME = "metric_query.sql"
@@ -33,12 +36,29 @@ ALERTS_VIEW_FILENAME = "alerts_view.sql"
 STATISTICS_QUERY_FILENAME = "statistics_query.sql"
 STATISTICS_VIEW_FILENAME = "statistics_view.sql"
 TEMPLATE_FOLDER = PATH / "templates"
-DATA_TYPES = {"histogram", "scalar"}  # todo: enum
+DATA_TYPES = ("histogram", "scalar")  # todo: enum
 SCHEMA_VERSIONS = {"metric": 1, "statistic": 2, "alert": 2}
 METRICS_JOIN_KEYS = ["client_id", "submission_date", "build_id", "branch"]
 MAX_DIMENSIONS_PER_METRIC_QUERY = 40
+MAX_DRY_RUN_WORKERS = 3
 TABLE_EXPIRATION_MS = 66960000000  # expiration set to 775 days
 
+# compile templates at import so the first run doesn't pay for it,
+# can be disabled for constrained environments
+if os.environ.get("OPMON_NO_PRECOMPILE") != "1":
+    for template_name in SQL_TEMPLATES:
+        jinja_env().get_template(template_name)
+
+_APP_ID_RE = re.compile(r"[^a-zA-Z0-9]")
+
+
+@lru_cache(maxsize=64)
+def _app_id_to_bigquery_dataset(app_id: Optional[str]) -> Optional[str]:
+    """Return the BigQuery dataset name of an app ID."""
+    if app_id is None:
+        return None
+    return _APP_ID_RE.sub("_", app_id).lower()
+
 
 @attr.s(auto_attribs=True)
 class Monitoring:
@@ -58,6 +78,10 @@ class Monitoring:
     # e.g., including a relevant date, query type, etc.
     before_execute_callback: Optional[BeforeExecuteCallback] = None
 
+    # Run the metrics, statistics and alerts queries with interactive priority
+    # instead of batch priority. View DDLs always run interactively.
+    interactive: bool = False
+
     @property
     def bigquery(self):
         """Return the BigQuery client instance."""
@@ -66,29 +90,80 @@ class Monitoring:
             self._client.before_execute_callback = self.before_execute_callback
         return self._client
 
-    @property
+    @cached_property
     def normalized_slug(self):
         """Return the normalized slug."""
         return bq_normalize_name(self.slug)
 
+    @cached_property
+    def _summaries(self) -> List[Summary]:
+        """Return the summaries (metric and statistic pairs) of the project."""
+        return [Summary.from_config(summary) for summary in self.config.metrics]
+
+    @cached_property
+    def _base_render_kwargs(self) -> Dict[str, Any]:
+        """Return the template parameters shared by all queries of the project."""
+        return {
+            "gcp_project": self.project,
+            "dataset": self.dataset,
+            "derived_dataset": self.derived_dataset,
+            "config": self.config.project,
+            "normalized_slug": self.normalized_slug,
+            "dimensions": self.config.dimensions,
+        }
+
+    @cached_property
+    def _platform(self) -> Platform:
+        """Return the platform config of the app the project is monitoring."""
+        from opmon.platform import PLATFORM_CONFIGS
+
+        project = self.config.project
+        app_name = project.app_name if project and project.app_name else "firefox_desktop"
+        return PLATFORM_CONFIGS[app_name]
+
+    @cached_property
+    def _channel(self) -> Optional[str]:
+        """Return the release channel the project population is restricted to."""
+        project = self.config.project
+        if project and project.population.channel:
+            return project.population.channel.value
+        return None
+
+    @cached_property
+    def _metrics_per_dataset(self) -> Dict[str, List[Metric]]:
+        """Group metrics that are part of the same dataset.
+
+        Necessary for creating the SQL template. A metric can have several
+        statistics, but only needs to be computed once per dataset.
+        """
+        metrics_per_dataset: Dict[str, List[Metric]] = {}
+        seen: Dict[str, Set[str]] = {}
+        for summary in self.config.metrics:
+            data_source = summary.metric.data_source.name
+            # metrics aren't hashable, so deduplicate by name
+            if summary.metric.name not in seen.setdefault(data_source, set()):
+                seen[data_source].add(summary.metric.name)
+                metrics_per_dataset.setdefault(data_source, []).append(summary.metric)
+        return metrics_per_dataset
+
     def run(self, submission_date):
         """Execute and generate the operational monitoring ETL for a specific date."""
         if self.config.project.skip:
-            print(f"Skipping {self.slug}")
+            logger.info(f"Skipping {self.slug}")
             return True
 
         try:
             self._check_runnable(submission_date)
         except Exception as e:
-            print(f"Failed to run opmon project: {e}")
+            logger.info(f"Failed to run opmon project: {e}")
             return
 
-        print(f"Run metrics query for {self.slug}")
+        logger.info(f"Run metrics query for {self.slug}")
         self._run_metrics_sql(submission_date)
 
-        print(f"Create metrics view for {self.slug}")
+        logger.info(f"Create metrics view for {self.slug}")
         self.bigquery.execute(
-            self._get_metric_view_sql(),
+            self._metric_view_sql,
             annotations={
                 "slug": self.slug,
                 "type": "metrics_view",
@@ -96,12 +171,12 @@ class Monitoring:
             },
         )
 
-        print(f"Calculate statistics for {self.slug}")
+        logger.info(f"Calculate statistics for {self.slug}")
         self._run_statistics_sql(submission_date)
 
-        print(f"Create statistics view for {self.slug}")
+        logger.info(f"Create statistics view for {self.slug}")
         self.bigquery.execute(
-            self._get_statistics_view_sql(),
+            self._statistics_view_sql,
             annotations={
                 "slug": self.slug,
                 "type": "statistics_view",
@@ -109,7 +184,7 @@ class Monitoring:
             },
         )
 
-        print(f"Create alerts data for {self.slug}")
+        logger.info(f"Create alerts data for {self.slug}")
         self._run_sql_for_alerts(submission_date)
 
         return True
@@ -119,44 +194,57 @@ class Monitoring:
         try:
             self._check_runnable(submission_date)
         except Exception as e:
-            print(f"Failed to run opmon project: {e}")
+            logger.info(f"Failed to run opmon project: {e}")
             return
 
         table_name = f"{self.normalized_slug}_v{SCHEMA_VERSIONS['metric']}"
 
-        join_keys = METRICS_JOIN_KEYS
-        for dimension in self.config.dimensions:
-            join_keys.append(dimension.name)
+        join_keys = METRICS_JOIN_KEYS + [dimension.name for dimension in self.config.dimensions]
 
-        self.bigquery.execute(
+        self._run_partitioned_sql(
             self._get_metrics_sql(submission_date=submission_date, table_name=table_name),
+            table_name=table_name,
+            submission_date=submission_date,
+            query_type="metrics_query",
+            partition_expiration_ms=TABLE_EXPIRATION_MS,
+            join_keys=join_keys,
+        )
+
+    def _run_partitioned_sql(
+        self,
+        sql: Union[str, List[str]],
+        table_name: str,
+        submission_date: datetime,
+        query_type: str,
+        **kwargs,
+    ) -> None:
+        """Write the query results to the submission date partition of a derived table."""
+        self.bigquery.execute(
+            sql,
             destination_table=f"{table_name}${submission_date:%Y%m%d}",
             clustering=["build_id"],
             time_partitioning="submission_date",
-            partition_expiration_ms=TABLE_EXPIRATION_MS,
             write_disposition=bigquery.job.WriteDisposition.WRITE_TRUNCATE,
             dataset=self.derived_dataset,
-            join_keys=join_keys,
             annotations={
                 "slug": self.slug,
-                "type": "metrics_query",
+                "type": query_type,
                 "submission_date": submission_date,
             },
+            priority=(
+                bigquery.QueryPriority.INTERACTIVE
+                if self.interactive
+                else bigquery.QueryPriority.BATCH
+            ),
+            **kwargs,
         )
 
     def _render_sql(self, template_file: str, render_kwargs: Dict[str, Any]):
         """Render and return the SQL from a template."""
-        file_loader = FileSystemLoader(TEMPLATE_FOLDER)
-        env = Environment(loader=file_loader)
-        template = env.get_template(template_file)
+        template = jinja_env().get_template(template_file)
         sql = template.render(**render_kwargs)
         return sql
 
-    def _app_id_to_bigquery_dataset(self, app_id: Optional[str]) -> Optional[str]:
-        if app_id is None:
-            return None
-        return re.sub(r"[^a-zA-Z0-9]", "_", app_id).lower()
-
     def _get_metrics_sql(
         self,
         submission_date: datetime,
@@ -173,60 +261,26 @@ class Monitoring:
                 extra={"experiment": self.slug},
             )
 
-        # group metrics that are part of the same dataset
-        # necessary for creating the SQL template
-        metrics_per_dataset = {}
-        for metric in metrics:
-            if metric.metric.data_source.name not in metrics_per_dataset:
-                metrics_per_dataset[metric.metric.data_source.name] = [metric.metric]
-            else:
-                if metric.metric not in metrics_per_dataset[metric.metric.data_source.name]:
-                    metrics_per_dataset[metric.metric.data_source.name].append(metric.metric)
+        metrics_per_dataset = self._metrics_per_dataset
 
         # check if this is the first time the queries are executed
         # the queries are referencing the destination table if build_id is used for the time frame
         if first_run is None:
-            first_run = True
-            if table_name is not None:
-                try:
-                    self.bigquery.client.get_table(
-                        f"{self.project}.{self.derived_dataset}.{table_name}"
-                    )
-                except cloud.exceptions.NotFound:
-                    first_run = True
-                else:
-                    first_run = False
-
-        print(first_run)
+            first_run = table_name is None or not table_exists(
+                self.bigquery.client, f"{self.project}.{self.derived_dataset}.{table_name}"
+            )
 
         render_kwargs = {
+            **self._base_render_kwargs,
             "header": "-- Generated via opmon\n",
-            "gcp_project": self.project,
             "submission_date": submission_date,
-            "config": self.config.project,
-            "dataset": self.dataset,
             "first_run": first_run,
             "slug": self.slug,
-            "normalized_slug": self.normalized_slug,
             "table_version": SCHEMA_VERSIONS["metric"],
-            "is_glean_app": PLATFORM_CONFIGS[
-                self.config.project.app_name or "firefox_desktop"
-                if self.config.project
-                else "firefox_desktop"
-            ].is_glean_app,
-            "app_id": self._app_id_to_bigquery_dataset(
-                PLATFORM_CONFIGS[
-                    self.config.project.app_name or "firefox_desktop"
-                    if self.config.project
-                    else "firefox_desktop"
-                ].app_id.get(
-                    self.config.project.population.channel.value
-                    if self.config.project.population.channel
-                    else None,
-                    None,
-                )
+            "is_glean_app": self._platform.is_glean_app,
+            "app_id": _app_id_to_bigquery_dataset(
+                self._platform.app_id.get(self._channel) if self._channel else None
             ),
-            "dimensions": self.config.dimensions,
         }
 
         sql_filename = METRIC_QUERY_FILENAME
@@ -260,14 +314,11 @@ class Monitoring:
             return sql[0]
         return sql
 
-    def _get_metric_view_sql(self) -> str:
+    @cached_property
+    def _metric_view_sql(self) -> str:
         """Return the SQL to create a BigQuery view."""
         render_kwargs = {
-            "gcp_project": self.project,
-            "derived_dataset": self.derived_dataset,
-            "dataset": self.dataset,
-            "config": self.config.project,
-            "normalized_slug": self.normalized_slug,
+            **self._base_render_kwargs,
             "table_version": SCHEMA_VERSIONS["metric"],
         }
         sql = self._render_sql(METRIC_VIEW_FILENAME, render_kwargs)
@@ -275,47 +326,31 @@ class Monitoring:
 
     def _run_statistics_sql(self, submission_date):
         table_name = f"{self.normalized_slug}_statistics_v{SCHEMA_VERSIONS['statistic']}"
-        self.bigquery.execute(
+        self._run_partitioned_sql(
             self._get_statistics_sql(submission_date=submission_date),
-            destination_table=f"{table_name}${submission_date:%Y%m%d}",
-            clustering=["build_id"],
-            time_partitioning="submission_date",
-            write_disposition=bigquery.job.WriteDisposition.WRITE_TRUNCATE,
-            dataset=self.derived_dataset,
+            table_name=table_name,
+            submission_date=submission_date,
+            query_type="statistics_query",
         )
 
     def _get_statistics_sql(self, submission_date) -> str:
         """Return the SQL to run the statistics."""
         render_kwargs = {
-            "gcp_project": self.project,
-            "dataset": self.dataset,
-            "derived_dataset": self.derived_dataset,
-            "config": self.config.project,
-            "normalized_slug": self.normalized_slug,
-            "dimensions": self.config.dimensions,
-            "dimension_permutations": [
-                list(i)
-                for i in itertools.product([True, False], repeat=len(self.config.dimensions))
-                if any(i)
-            ],
-            "summaries": [Summary.from_config(summary) for summary in self.config.metrics],
+            **self._base_render_kwargs,
+            "summaries": self._summaries,
             "submission_date": submission_date,
             "table_version": SCHEMA_VERSIONS["metric"],
         }
         sql = self._render_sql(STATISTICS_QUERY_FILENAME, render_kwargs)
         return sql
 
-    def _get_statistics_view_sql(self) -> str:
+    @cached_property
+    def _statistics_view_sql(self) -> str:
         """Return the SQL to create a BigQuery view."""
         render_kwargs = {
-            "gcp_project": self.project,
-            "dataset": self.dataset,
-            "derived_dataset": self.derived_dataset,
-            "config": self.config.project,
-            "normalized_slug": self.normalized_slug,
+            **self._base_render_kwargs,
             "table_version": SCHEMA_VERSIONS["statistic"],
-            "summaries": [Summary.from_config(summary) for summary in self.config.metrics],
-            "dimensions": self.config.dimensions,
+            "summaries": self._summaries,
         }
         sql = self._render_sql(STATISTICS_VIEW_FILENAME, render_kwargs)
         return sql
@@ -339,19 +374,13 @@ class Monitoring:
 
     def _get_sql_for_alerts(self, submission_date) -> str:
         """Get the alerts view SQL."""
-        alerts: Dict[str, Any] = {}
-        for alert_type in AlertType:
-            alerts[alert_type.value] = []
+        alerts: Dict[str, List[Any]] = {alert_type.value: [] for alert_type in AlertType}
 
         for alert in self.config.alerts:
             alerts[alert.type.value].append(alert)
 
         render_kwargs = {
-            "gcp_project": self.project,
-            "dataset": self.dataset,
-            "config": self.config.project,
-            "normalized_slug": self.normalized_slug,
-            "dimensions": self.config.dimensions,
+            **self._base_render_kwargs,
             "alerts": alerts,
             "submission_date": submission_date,
         }
@@ -363,31 +392,24 @@ class Monitoring:
         try:
             self._check_runnable(submission_date)
         except Exception as e:
-            print(f"Failed to run opmon project: {e}")
+            logger.info(f"Failed to run opmon project: {e}")
             return
 
-        total_alerts = 0
-
-        for _ in self.config.alerts:
-            total_alerts += 1
-
-        if total_alerts <= 0:
-            print(f"No alerts configured for {self.normalized_slug}")
+        if not self.config.alerts:
+            logger.info(f"No alerts configured for {self.normalized_slug}")
             return
 
         table_name = f"{self.normalized_slug}_alerts_v{SCHEMA_VERSIONS['alert']}"
-        self.bigquery.execute(
+        self._run_partitioned_sql(
             self._get_sql_for_alerts(submission_date=submission_date),
-            destination_table=f"{table_name}${submission_date:%Y%m%d}",
-            clustering=["build_id"],
-            time_partitioning="submission_date",
-            write_disposition=bigquery.job.WriteDisposition.WRITE_TRUNCATE,
-            dataset=self.derived_dataset,
+            table_name=table_name,
+            submission_date=submission_date,
+            query_type="alerts_query",
         )
 
-        print(f"Create alerts view for {self.slug}")
+        logger.info(f"Create alerts view for {self.slug}")
         self.bigquery.execute(
-            self._get_alerts_view_sql(),
+            self._alerts_view_sql,
             annotations={
                 "slug": self.slug,
                 "type": "alerts_view",
@@ -395,13 +417,11 @@ class Monitoring:
             },
         )
 
-    def _get_alerts_view_sql(self) -> str:
+    @cached_property
+    def _alerts_view_sql(self) -> str:
         """Return the SQL to create a BigQuery view."""
         render_kwargs = {
-            "gcp_project": self.project,
-            "dataset": self.dataset,
-            "derived_dataset": self.derived_dataset,
-            "normalized_slug": self.normalized_slug,
+            **self._base_render_kwargs,
             "table_version": SCHEMA_VERSIONS["alert"],
         }
         sql = self._render_sql(ALERTS_VIEW_FILENAME, render_kwargs)
@@ -418,7 +438,7 @@ class Monitoring:
             submission_date=self.config.project.start_date,  # type: ignore
             first_run=True,
         )
-        print(f"Dry run metrics SQL for {self.normalized_slug}")
+        logger.info(f"Dry run metrics SQL for {self.normalized_slug}")
 
         if callable(self.before_execute_callback):
             # Before and after are the same query for metrics: there's no
@@ -464,7 +484,9 @@ class Monitoring:
                         "submission_date": self.config.project.start_date,
                     },
                 )
-        dry_run_query(metrics_sql)
+        # dry runs are independent of each other and only wait on the dry run
+        # service, so they are submitted together once all queries are rendered
+        dry_run_queries = list(metrics_sql) if isinstance(metrics_sql, list) else [metrics_sql]
 
         dummy_metrics = {}
         for summary in self.config.metrics:
@@ -483,16 +505,19 @@ class Monitoring:
                         )]
                     """
 
+        dimension_columns = [f"1 AS {d.name}" for d in self.config.dimensions]
+        metrics_table_columns = [
+            "CURRENT_DATE() AS submission_date",
+            "1 AS client_id",
+            "NULL AS build_id",
+            *dimension_columns,
+            '"foo" AS branch',
+            *(f"{d} AS {metric}" for metric, d in dummy_metrics.items()),
+        ]
         metrics_table_dummy = f"""
             (
                 SELECT
-                    CURRENT_DATE() AS submission_date,
-                    1 AS client_id,
-                    NULL AS build_id,
-                    {",".join([f"1 AS {d.name}" for d in self.config.dimensions])}
-                    {"," if len(self.config.dimensions) > 0 else ""}
-                    "foo" AS branch,
-                    {",".join([f"{d} AS {metric}" for metric, d in dummy_metrics.items()])}
+                    {",".join(metrics_table_columns)}
             )
         """
 
@@ -520,7 +545,7 @@ class Monitoring:
             + f"_v{SCHEMA_VERSIONS['metric']}`",
             metrics_table_dummy,
         )
-        print(f"Dry run statistics SQL for {self.normalized_slug}")
+        logger.info(f"Dry run statistics SQL for {self.normalized_slug}")
 
         # But the modified query is what is actually submitted.
         if callable(self.before_execute_callback):
@@ -533,27 +558,25 @@ class Monitoring:
                     "submission_date": self.config.project.start_date,
                 },
             )
-        dry_run_query(statistics_sql)
-
-        total_alerts = 0
-        for _ in self.config.alerts:
-            total_alerts += 1
-
-        if total_alerts > 0:
+        dry_run_queries.append(statistics_sql)
+
+        if self.config.alerts:
+            statistics_table_columns = [
+                "CURRENT_DATE() AS submission_date",
+                "NULL AS build_id",
+                '"test" AS metric',
+                '"test" AS statistic',
+                '"disabled" AS branch',
+                *dimension_columns,
+                "1.2 AS point",
+                "NULL AS lower",
+                "NULL AS upper",
+                "NULL AS parameter",
+            ]
             statistics_table_dummy = f"""
                 (
                     SELECT
-                        CURRENT_DATE() AS submission_date,
-                        NULL AS build_id,
-                        "test" AS metric,
-                        "test" AS statistic,
-                        "disabled" AS branch,
-                        {",".join([f"1 AS {d.name}" for d in self.config.dimensions])}
-                        {"," if len(self.config.dimensions) > 0 else ""}
-                        1.2 AS point,
-                        NULL AS lower,
-                        NULL AS upper,
-                        NULL AS parameter
+                        {",".join(statistics_table_columns)}
                 )
             """
             alerts_sql = self._get_sql_for_alerts(
@@ -576,7 +599,7 @@ class Monitoring:
                 f"`{self.project}.{self.dataset}.{self.normalized_slug}_statistics`",
                 statistics_table_dummy,
             )
-            print(f"Dry run alerts SQL for {self.normalized_slug}")
+            logger.info(f"Dry run alerts SQL for {self.normalized_slug}")
 
             if callable(self.before_execute_callback):
                 self.before_execute_callback(
@@ -588,4 +611,10 @@ class Monitoring:
                         "submission_date": self.config.project.start_date,
                     },
                 )
-            dry_run_query(alerts_sql)
+            dry_run_queries.append(alerts_sql)
+
+        with ThreadPoolExecutor(
+            max_workers=min(MAX_DRY_RUN_WORKERS, len(dry_run_queries))
+        ) as executor:
+            # consume the results to raise any dry run failure
+            list(executor.map(dry_run_query, dry_run_queries))
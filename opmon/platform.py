@@ -1,12 +1,19 @@
 """Parse and handle platform specific configs."""
 
-from pathlib import Path
+import os
+from functools import lru_cache
 from typing import Any, Dict, MutableMapping
 
 import attr
-import toml
 
-platform_config = toml.load(Path(__file__).parent.parent / "platform_config.toml")
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib  # type: ignore
+
+PLATFORM_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "platform_config.toml"
+)
 
 
 class PlatformConfigurationException(Exception):
@@ -15,7 +22,7 @@ class PlatformConfigurationException(Exception):
     pass
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class Platform:
     """
     Platform configuration object. Contains all required settings for OpMon.
@@ -28,7 +35,7 @@ class Platform:
     """
 
     def _check_value_not_null(self, attribute, value):
-        if not value and str(value).lower() == "none":
+        if value is None or (isinstance(value, str) and value.lower() in ("", "none")):
             raise PlatformConfigurationException(
                 "'%s' attribute requires a value, please double check \
                     platform configuration file. Value provided: %s"
@@ -37,24 +44,31 @@ class Platform:
 
     app_name: str = attr.ib(validator=_check_value_not_null)
     is_glean_app: bool = True
-    app_id: Dict[str, str] = {}
+    app_id: Dict[str, str] = attr.Factory(dict)
 
 
 def _generate_platform_config(config: MutableMapping[str, Any]) -> Dict[str, Platform]:
     """Take platform configuration and generate platform object map."""
-    processed_config = dict()
-
-    for platform, platform_config in config["platform"].items():
-        processed_config[platform] = {
-            "is_glean_app": platform_config.get("is_glean_app", True),
-            "app_name": platform,
-            "app_id": platform_config.get("app_id", {}),
-        }
-
     return {
-        platform: Platform(**platform_config)
-        for platform, platform_config in processed_config.items()
+        name: Platform(
+            app_name=name,
+            is_glean_app=platform_config.get("is_glean_app", True),
+            app_id=platform_config.get("app_id", {}),
+        )
+        for name, platform_config in config["platform"].items()
     }
 
 
-PLATFORM_CONFIGS = _generate_platform_config(platform_config)
+@lru_cache(maxsize=1)
+def _load_platform_configs() -> Dict[str, Platform]:
+    """Parse the platform configuration file."""
+    with open(PLATFORM_CONFIG_PATH, "rb") as config_file:
+        platform_config = tomllib.load(config_file)
+    return _generate_platform_config(platform_config)
+
+
+def __getattr__(name: str) -> Any:
+    """Load PLATFORM_CONFIGS on first access rather than on import."""
+    if name == "PLATFORM_CONFIGS":
+        return _load_platform_configs()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,7 @@
 """Implementations of custom statistics that can be referenced in metric configs."""
 
-import copy
 import re
-from abc import ABC
-from typing import Any, Dict, List
+from typing import Any, Dict, Tuple, Type
 
 import attr
 from metric_config_parser import metric as parser_metric
@@ -11,9 +9,42 @@ from metric_config_parser.metric import Metric
 
 from opmon.errors import StatisticNotImplementedForTypeException
 
+_CAMEL_CASE_WORD_RE = re.compile("(.)([A-Z][a-z]+)")
+_CAMEL_CASE_BOUNDARY_RE = re.compile("([a-z0-9])([A-Z])")
 
-@attr.s(auto_attribs=True)
-class Statistic(ABC):
+# snake-cased names of statistic classes, these are looked up for every summary
+_STATISTIC_NAMES: Dict[type, str] = {}
+
+# type of the results returned by statistic computations, see Statistic.compute
+_RESULT_ARRAY_TYPE = """ARRAY<STRUCT<
+                metric STRING,
+                statistic STRING,
+                point FLOAT64,
+                lower FLOAT64,
+                upper FLOAT64,
+                parameter STRING
+            >>"""
+
+# percentiles with bootstrapped confidence intervals, computed over the
+# normalized histograms of a metric for both scalar and histogram metrics
+_BOOTSTRAP_PERCENTILE_CI_SQL = """
+            `moz-fx-data-shared-prod.udf_js.bootstrap_percentile_ci`(
+                {percentiles},
+                merge_histogram_values(
+                    ARRAY_CONCAT_AGG(
+                        {histograms}
+                    )
+                ),
+                "{metric}"
+            )
+        """
+
+# statistic classes by name, subclasses of Statistic get registered when they are defined
+_STATISTICS: Dict[str, Type["Statistic"]] = {}
+
+
+@attr.s(auto_attribs=True, slots=True)
+class Statistic:
     """
     Abstract representation of a statistic.
 
@@ -22,12 +53,19 @@ class Statistic(ABC):
     of the experiment.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        """Register the statistic so that it can be referenced by name in configs."""
+        super().__init_subclass__(**kwargs)
+        _STATISTICS[cls.name()] = cls
+
     @classmethod
     def name(cls):
         """Return snake-cased name of the statistic."""
-        # https://stackoverflow.com/a/1176023
-        name = re.sub("(.)([A-Z][a-z]+)", r"\1_\2", cls.__name__)
-        return re.sub("([a-z0-9])([A-Z])", r"\1_\2", name).lower()
+        if cls not in _STATISTIC_NAMES:
+            # https://stackoverflow.com/a/1176023
+            name = _CAMEL_CASE_WORD_RE.sub(r"\1_\2", cls.__name__)
+            _STATISTIC_NAMES[cls] = _CAMEL_CASE_BOUNDARY_RE.sub(r"\1_\2", name).lower()
+        return _STATISTIC_NAMES[cls]
 
     def compute(self, metric: Metric) -> str:
         """
@@ -42,24 +80,36 @@ class Statistic(ABC):
             parameter STRING
         >>
         """
-        if metric.type == "scalar":
-            return self._scalar_compute(metric)
-        elif metric.type == "histogram":
-            return self._histogram_compute(metric)
-        else:
-            raise StatisticNotImplementedForTypeException(
-                f"Statistic {self.name()} not implemented for type {metric.type} ({metric.name})"
-            )
-
-    def _scalar_compute(self, metric: Metric) -> str:
-        raise StatisticNotImplementedForTypeException(
+        # statistics implement _<metric type>_compute for each type they support
+        compute = getattr(self, f"_{metric.type}_compute", None)
+        if compute is None:
+            raise self._not_implemented(metric)
+        return compute(metric)
+
+    def _not_implemented(self, metric: Metric) -> StatisticNotImplementedForTypeException:
+        return StatisticNotImplementedForTypeException(
             f"Statistic {self.name()} not implemented for type {metric.type} ({metric.name})"
         )
 
-    def _histogram_compute(self, metric: Metric) -> str:
-        raise StatisticNotImplementedForTypeException(
-            f"Statistic {self.name()} not implemented for type {metric.type} ({metric.name})"
-        )
+    def _scalar_compute(self, metric: Metric) -> str:
+        return f"""{_RESULT_ARRAY_TYPE}[
+            STRUCT(
+                "{metric.name}" AS metric,
+                "{self.name()}" AS statistic,
+                {self._scalar_point(metric)} AS point,
+                NULL AS lower,
+                NULL AS upper,
+                {self._scalar_parameter()} AS parameter
+            )
+        ]"""
+
+    def _scalar_point(self, metric: Metric) -> str:
+        """Return the SQL expression computing the point estimate of a scalar metric."""
+        raise self._not_implemented(metric)
+
+    def _scalar_parameter(self) -> str:
+        """Return the SQL expression of the parameter reported for scalar metrics."""
+        return "NULL"
 
     @classmethod
     def from_dict(cls, config_dict: Dict[str, Any]):
@@ -70,115 +120,63 @@ class Statistic(ABC):
 class Count(Statistic):
     """Count statistic."""
 
-    def _scalar_compute(self, metric: Metric):
-        return f"""ARRAY<STRUCT<
-                metric STRING,
-                statistic STRING,
-                point FLOAT64,
-                lower FLOAT64,
-                upper FLOAT64,
-                parameter STRING
-            >>[
-            STRUCT(
-                "{metric.name}" AS metric,
-                "{self.name()}" AS statistic,
-                COUNT({metric.name}) AS point,
-                NULL AS lower,
-                NULL AS upper,
-                NULL AS parameter
-            )
-        ]"""
+    def _scalar_point(self, metric: Metric):
+        return f"COUNT({metric.name})"
 
 
 class Sum(Statistic):
     """Sum statistic."""
 
-    def _scalar_compute(self, metric: Metric):
-        return f"""ARRAY<STRUCT<
-                metric STRING,
-                statistic STRING,
-                point FLOAT64,
-                lower FLOAT64,
-                upper FLOAT64,
-                parameter STRING
-            >>[
-            STRUCT(
-                "{metric.name}" AS metric,
-                "{self.name()}" AS statistic,
-                SUM({metric.name}) AS point,
-                NULL AS lower,
-                NULL AS upper,
-                NULL AS parameter
-            )
-        ]"""
+    def _scalar_point(self, metric: Metric):
+        return f"SUM({metric.name})"
 
 
 class Mean(Statistic):
     """Mean statistic."""
 
-    def _scalar_compute(self, metric: Metric):
-        return f"""ARRAY<STRUCT<
-                metric STRING,
-                statistic STRING,
-                point FLOAT64,
-                lower FLOAT64,
-                upper FLOAT64,
-                parameter STRING
-            >>[
-            STRUCT(
-                "{metric.name}" AS metric,
-                "{self.name()}" AS statistic,
-                AVG({metric.name}) AS point,
-                NULL AS lower,
-                NULL AS upper,
-                NULL AS parameter
-            )
-        ]"""
+    def _scalar_point(self, metric: Metric):
+        return f"AVG({metric.name})"
 
 
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class Quantile(Statistic):
     """Quantile statistic."""
 
     number_of_quantiles: int = 100
     quantile: int = 50
 
-    def _scalar_compute(self, metric: Metric):
-        return f"""ARRAY<STRUCT<
-                metric STRING,
-                statistic STRING,
-                point FLOAT64,
-                lower FLOAT64,
-                upper FLOAT64,
-                parameter STRING
-            >>[
-            STRUCT(
-                "{metric.name}" AS metric,
-                "{self.name()}" AS statistic,
-                APPROX_QUANTILES(
+    def _scalar_point(self, metric: Metric):
+        return f"""APPROX_QUANTILES(
                     {metric.name},
                     {self.number_of_quantiles}
-                )[OFFSET({self.quantile})] AS point,
-                NULL AS lower,
-                NULL AS upper,
-                {self.quantile} AS parameter
-            )
-        ]"""
+                )[OFFSET({self.quantile})]"""
+
+    def _scalar_parameter(self):
+        return str(self.quantile)
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class Percentile(Statistic):
     """Percentile with confidence interval statistic."""
 
-    percentiles: List[int] = [50, 90, 99]
+    percentiles: Tuple[int, ...] = attr.ib(default=(50, 90, 99), converter=tuple)
     remove_nulls: bool = False
 
+    @property
+    def _percentiles_sql(self) -> str:
+        """Return the percentiles as a SQL array literal."""
+        return f"[{', '.join(str(percentile) for percentile in self.percentiles)}]"
+
+    def _bootstrap_percentile_ci(self, metric: Metric, histograms: str) -> str:
+        """Return the percentiles with confidence intervals of the aggregated histograms."""
+        return _BOOTSTRAP_PERCENTILE_CI_SQL.format(
+            percentiles=self._percentiles_sql, histograms=histograms, metric=metric.name
+        )
+
     def _scalar_compute(self, metric: Metric):
-        return f"""
-            `moz-fx-data-shared-prod.udf_js.bootstrap_percentile_ci`(
-                {self.percentiles},
-                merge_histogram_values(
-                    ARRAY_CONCAT_AGG(
-                        histogram_normalized_sum(
+        return self._bootstrap_percentile_ci(
+            metric,
+            f"""histogram_normalized_sum(
                             [IF({self.remove_nulls} AND {metric.name} IS NULL,
                                 NULL,
                                 STRUCT<values ARRAY<STRUCT<key FLOAT64, value FLOAT64>>>(
@@ -191,54 +189,29 @@ class Percentile(Statistic):
                                     ), 1.0
                                 )]
                             ))], 1.0
-                        )
-                    )
-                ),
-                "{metric.name}"
-            )
-        """
+                        )""",
+        )
 
     def _histogram_compute(self, metric: Metric):
-        return f"""
-            `moz-fx-data-shared-prod.udf_js.bootstrap_percentile_ci`(
-                {self.percentiles},
-                merge_histogram_values(
-                    ARRAY_CONCAT_AGG(
-                        histogram_normalized_sum({metric.name}, 1.0)
-                    )
-                ),
-                "{metric.name}"
-            )
-        """
+        return self._bootstrap_percentile_ci(
+            metric, f"histogram_normalized_sum({metric.name}, 1.0)"
+        )
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class TotalRatio(Statistic):
     """Compute the ratio of the sum of two metrics."""
 
     denominator_metric: str
 
-    def _scalar_compute(self, metric: Metric):
-        return f"""ARRAY<STRUCT<
-                metric STRING,
-                statistic STRING,
-                point FLOAT64,
-                lower FLOAT64,
-                upper FLOAT64,
-                parameter STRING
-            >>[
-            STRUCT(
-                "{metric.name}" AS metric,
-                "{self.name()}" AS statistic,
-                SUM({metric.name}) / SUM({self.denominator_metric}) AS point,
-                NULL AS lower,
-                NULL AS upper,
-                '{self.denominator_metric}' AS parameter
-            )
-        ]"""
+    def _scalar_point(self, metric: Metric):
+        return f"SUM({metric.name}) / SUM({self.denominator_metric})"
+
+    def _scalar_parameter(self):
+        return f"'{self.denominator_metric}'"
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class Summary:
     """Represents a metric with a statistical treatment."""
 
@@ -250,16 +223,12 @@ class Summary:
         """Create a Jetstream-native Summary representation."""
         metric = summary_config.metric
 
-        found = False
-        for statistic in Statistic.__subclasses__():
-            if statistic.name() == summary_config.statistic.name:
-                found = True
-                break
+        statistic = _STATISTICS.get(summary_config.statistic.name)
 
-        if not found:
+        if statistic is None:
             raise ValueError(f"Statistic '{summary_config.statistic.name}' does not exist.")
 
-        stats_params = copy.deepcopy(summary_config.statistic.params)
+        stats_params = dict(summary_config.statistic.params)
 
         return cls(
             metric=metric,
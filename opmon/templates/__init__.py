@@ -1 +1,36 @@
 """SQL Templates."""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from jinja2 import DictLoader, Environment, FileSystemBytecodeCache
+
+TEMPLATE_FOLDER = Path(os.path.dirname(__file__))
+
+# templates are shipped with the package and don't change at runtime,
+# includes (UDFs, population, where clause) need to be loaded as well
+SQL_TEMPLATES = {
+    path.name: path.read_text(encoding="utf-8") for path in TEMPLATE_FOLDER.glob("*.sql")
+}
+
+
+@lru_cache(maxsize=1)
+def jinja_env() -> Environment:
+    """Return the Jinja environment shared by everything rendering SQL templates.
+
+    The environment is created on first use. Compiled templates can optionally be
+    persisted across processes by setting `OPMON_JINJA_CACHE=1`; stale entries are
+    detected by Jinja using a checksum of the template source, and Jinja's default
+    cache directory is private to the current user (mode 0700, owner checked).
+    """
+    bytecode_cache = None
+    if os.environ.get("OPMON_JINJA_CACHE") == "1":
+        bytecode_cache = FileSystemBytecodeCache(pattern="opmon_%s.cache")
+
+    return Environment(
+        loader=DictLoader(SQL_TEMPLATES),
+        auto_reload=False,
+        cache_size=-1,
+        bytecode_cache=bytecode_cache,
+    )
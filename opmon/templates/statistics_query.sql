@@ -52,6 +52,9 @@ buckets_by_metric AS (
 
 -- todo: support custom dimensions
 -- This generates an 'all' entry for each dimension, combining all values
+{#
+re-enabling this requires passing dimension_permutations (all non-empty combinations
+of enabled dimensions) to the template again, see Monitoring._get_statistics_sql
 -- with_all_dimensions AS (
 --     SELECT
 --         * 
@@ -88,6 +91,7 @@ buckets_by_metric AS (
 --         {% endfor %}
 --     {% endfor %}
 -- ),
+#}
 
 
 SELECT
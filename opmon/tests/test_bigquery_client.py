@@ -0,0 +1,38 @@
+from unittest.mock import MagicMock
+
+from google.api_core.exceptions import NotFound
+
+from opmon import bigquery_client
+from opmon.bigquery_client import (
+    DEFAULT_QUERY_CONCURRENCY,
+    _query_concurrency,
+    table_exists,
+)
+
+
+def test_table_exists(monkeypatch):
+    monkeypatch.setattr(bigquery_client, "_EXISTING_TABLES", set())
+    client = MagicMock()
+    client.get_table.side_effect = NotFound("missing")
+    assert not table_exists(client, "test.test_derived.test_exists_v1")
+    assert not table_exists(client, "test.test_derived.test_exists_v1")
+    assert client.get_table.call_count == 2
+
+    client.get_table.side_effect = None
+    assert table_exists(client, "test.test_derived.test_exists_v1")
+    assert table_exists(client, "test.test_derived.test_exists_v1")
+    assert client.get_table.call_count == 3
+
+
+def test_query_concurrency(monkeypatch):
+    monkeypatch.delenv("OPMON_BQ_CONCURRENCY", raising=False)
+    assert _query_concurrency() == DEFAULT_QUERY_CONCURRENCY
+
+    monkeypatch.setenv("OPMON_BQ_CONCURRENCY", "3")
+    assert _query_concurrency() == 3
+
+    monkeypatch.setenv("OPMON_BQ_CONCURRENCY", "0")
+    assert _query_concurrency() == 1
+
+    monkeypatch.setenv("OPMON_BQ_CONCURRENCY", "many")
+    assert _query_concurrency() == DEFAULT_QUERY_CONCURRENCY
@@ -4,7 +4,6 @@ from datetime import timedelta
 from unittest.mock import MagicMock
 
 import pytest
-import pytz
 from metric_config_parser.experiment import Channel
 
 from opmon.experimenter import (
@@ -15,6 +14,7 @@ from opmon.experimenter import (
     ExperimentV6,
     Variant,
 )
+from opmon.utils import REQUEST_TIMEOUT
 
 EXPERIMENTER_FIXTURE_V1 = r"""
 [
@@ -314,10 +314,11 @@ FENIX_EXPERIMENT_FIXTURE = """
 """  # noqa:E501
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_session():
-    def experimenter_fixtures(url):
+    def experimenter_fixtures(url, timeout=None):
         mocked_value = MagicMock()
+        mocked_value.__enter__.return_value = mocked_value
         if url == ExperimentCollection.EXPERIMENTER_API_URL_V1:
             mocked_value.json.return_value = json.loads(EXPERIMENTER_FIXTURE_V1)
         elif url == ExperimentCollection.EXPERIMENTER_API_URL_V6:
@@ -332,20 +333,24 @@ def mock_session():
     return session
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def experiment_collection(mock_session):
     return ExperimentCollection.from_experimenter(mock_session)
 
 
 def test_from_experimenter(mock_session):
     collection = ExperimentCollection.from_experimenter(mock_session)
-    mock_session.get.assert_any_call(ExperimentCollection.EXPERIMENTER_API_URL_V1)
-    mock_session.get.assert_any_call(ExperimentCollection.EXPERIMENTER_API_URL_V6)
+    mock_session.get.assert_any_call(
+        ExperimentCollection.EXPERIMENTER_API_URL_V1, timeout=REQUEST_TIMEOUT
+    )
+    mock_session.get.assert_any_call(
+        ExperimentCollection.EXPERIMENTER_API_URL_V6, timeout=REQUEST_TIMEOUT
+    )
     assert len(collection.experiments) == 6
     assert isinstance(collection.experiments[0], Experiment)
     assert isinstance(collection.experiments[0].branches[0], Branch)
     assert len(collection.experiments[0].branches) == 2
-    assert collection.experiments[0].start_date > dt.datetime(2019, 1, 1, tzinfo=pytz.utc)
+    assert collection.experiments[0].start_date > dt.datetime(2019, 1, 1, tzinfo=dt.timezone.utc)
     assert len(collection.experiments[1].branches) == 2
 
 
@@ -1,15 +1,19 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from textwrap import dedent
+from unittest.mock import MagicMock
 
 import pytest
-import pytz
-import toml
 from metric_config_parser.monitoring import MonitoringConfiguration, MonitoringSpec
 
 from opmon import errors
 from opmon.config import ConfigLoader
 from opmon.monitoring import Monitoring
 
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib  # type: ignore
+
 
 class TestMonitoring:
     def test_init_monitoring(self):
@@ -42,7 +46,7 @@ class TestMonitoring:
             from_expression = "test"
             """
         )
-        spec = MonitoringSpec.from_dict(toml.loads(config_str))
+        spec = MonitoringSpec.from_dict(tomllib.loads(config_str))
         monitoring = Monitoring(
             project="test",
             dataset="test",
@@ -74,7 +78,7 @@ class TestMonitoring:
             from_expression = "test"
             """
         )
-        spec = MonitoringSpec.from_dict(toml.loads(config_str))
+        spec = MonitoringSpec.from_dict(tomllib.loads(config_str))
         monitoring = Monitoring(
             project="test",
             dataset="test",
@@ -84,7 +88,7 @@ class TestMonitoring:
         )
 
         with pytest.raises(errors.EndedException):
-            monitoring._check_runnable(current_date=datetime(2022, 2, 1, tzinfo=pytz.utc))
+            monitoring._check_runnable(current_date=datetime(2022, 2, 1, tzinfo=timezone.utc))
 
         config_str = dedent(
             """
@@ -106,7 +110,7 @@ class TestMonitoring:
             from_expression = "test"
             """
         )
-        spec = MonitoringSpec.from_dict(toml.loads(config_str))
+        spec = MonitoringSpec.from_dict(tomllib.loads(config_str))
         monitoring = Monitoring(
             project="test",
             dataset="test",
@@ -116,7 +120,8 @@ class TestMonitoring:
         )
 
         assert (
-            monitoring._check_runnable(current_date=datetime(2022, 1, 2, tzinfo=pytz.utc)) is True
+            monitoring._check_runnable(current_date=datetime(2022, 1, 2, tzinfo=timezone.utc))
+            is True
         )
 
     def test_get_metrics_sql_no_metrics(self):
@@ -126,7 +131,7 @@ class TestMonitoring:
             metrics = []
             """
         )
-        spec = MonitoringSpec.from_dict(toml.loads(config_str))
+        spec = MonitoringSpec.from_dict(tomllib.loads(config_str))
         monitoring = Monitoring(
             project="test",
             dataset="test",
@@ -136,7 +141,7 @@ class TestMonitoring:
         )
 
         assert "population" in monitoring._get_metrics_sql(
-            submission_date=datetime(2022, 1, 2, tzinfo=pytz.utc)
+            submission_date=datetime(2022, 1, 2, tzinfo=timezone.utc)
         )
 
     def test_get_metrics_sql(self):
@@ -164,7 +169,7 @@ class TestMonitoring:
             from_expression = "test_data_source"
             """
         )
-        spec = MonitoringSpec.from_dict(toml.loads(config_str))
+        spec = MonitoringSpec.from_dict(tomllib.loads(config_str))
         monitoring = Monitoring(
             project="test",
             dataset="test",
@@ -173,7 +178,7 @@ class TestMonitoring:
             config=spec.resolve(experiment=None, configs=ConfigLoader.configs),
         )
 
-        sql = monitoring._get_metrics_sql(submission_date=datetime(2022, 1, 2, tzinfo=pytz.utc))
+        sql = monitoring._get_metrics_sql(submission_date=datetime(2022, 1, 2, tzinfo=timezone.utc))
         assert "SELECT 1" in sql
         assert "test_data_source" in sql
 
@@ -205,7 +210,7 @@ class TestMonitoring:
             default_dataset = "test"
             """
         )
-        spec = MonitoringSpec.from_dict(toml.loads(config_str))
+        spec = MonitoringSpec.from_dict(tomllib.loads(config_str))
         monitoring = Monitoring(
             project="test",
             dataset="test",
@@ -215,5 +220,71 @@ class TestMonitoring:
         )
 
         assert "org_mozilla_fenix." in monitoring._get_metrics_sql(
-            submission_date=datetime(2022, 1, 2, tzinfo=pytz.utc)
+            submission_date=datetime(2022, 1, 2, tzinfo=timezone.utc)
+        )
+
+    def test_metric_view_sql(self):
+        config_str = dedent(
+            """
+            [project]
+            metrics = ["test"]
+            start_date = "2022-01-01"
+
+            [metrics]
+            [metrics.test]
+            select_expression = "SELECT 1"
+            data_source = "foo"
+            type = "scalar"
+
+            [metrics.test.statistics]
+            sum = {}
+
+            [data_sources]
+            [data_sources.foo]
+            from_expression = "test_data_source"
+            """
+        )
+        spec = MonitoringSpec.from_dict(tomllib.loads(config_str))
+        monitoring = Monitoring(
+            project="test",
+            dataset="test",
+            derived_dataset="test_derived",
+            slug="test-foo",
+            config=spec.resolve(experiment=None, configs=ConfigLoader.configs),
+        )
+
+        sql = monitoring._metric_view_sql
+        assert "CREATE OR REPLACE VIEW" in sql
+        assert "`test.test_derived.test_foo_v1`" in sql
+        assert monitoring._metric_view_sql is sql
+
+    def test_run_partitioned_sql(self):
+        client = MagicMock()
+        monitoring = Monitoring(
+            project="test",
+            dataset="test",
+            derived_dataset="test_derived",
+            slug="test-foo",
+            config=MonitoringConfiguration(),
+            client=client,
         )
+
+        submission_date = datetime(2022, 1, 2, tzinfo=timezone.utc)
+        monitoring._run_partitioned_sql(
+            "SELECT 1",
+            table_name="test_foo_statistics_v2",
+            submission_date=submission_date,
+            query_type="statistics_query",
+        )
+
+        client.execute.assert_called_once()
+        args, kwargs = client.execute.call_args
+        assert args == ("SELECT 1",)
+        assert kwargs["destination_table"] == "test_foo_statistics_v2$20220102"
+        assert kwargs["dataset"] == "test_derived"
+        assert kwargs["priority"] == "BATCH"
+        assert kwargs["annotations"] == {
+            "slug": "test-foo",
+            "type": "statistics_query",
+            "submission_date": submission_date,
+        }
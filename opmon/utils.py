@@ -2,10 +2,10 @@
 
 import logging
 import re
-import shutil
 import tempfile
 import time
 from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Optional
 
@@ -13,24 +13,27 @@ from requests import Session
 
 logger = logging.getLogger(__name__)
 
+_NON_IDENTIFIER_CHARS_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+# (connect, read) timeouts in seconds for API requests
+REQUEST_TIMEOUT = (5, 30)
+
 
 @contextmanager
 def TemporaryDirectory():
     """Create a temporary directory."""
-    name = Path(tempfile.mkdtemp())
-    try:
-        yield name
-    finally:
-        shutil.rmtree(name)
+    with tempfile.TemporaryDirectory() as name:
+        yield Path(name)
 
 
+@lru_cache(maxsize=1024)
 def bq_normalize_name(name: str) -> str:
     """
     Normalize a slug.
 
     Dashes are converted to underscores.
     """
-    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+    return _NON_IDENTIFIER_CHARS_RE.sub("_", name)
 
 
 class RetryLimitExceededException(Exception):
@@ -48,18 +51,21 @@ def retry_get(
     This is handy for working with the Experimenter API which occassionally
     experiences some issues and returns a failure code.
     """
+    if user_agent:
+        session.headers.update({"user-agent": user_agent})
+
     # based on https://stackoverflow.com/a/22726782
-    for _i in range(max_retries):
+    for i in range(max_retries):
         try:
-            if user_agent:
-                session.headers.update({"user-agent": user_agent})
-
-            blob = session.get(url).json()
+            with session.get(url, timeout=REQUEST_TIMEOUT) as response:
+                response.raise_for_status()
+                blob = response.json()
             break
         except Exception as e:
-            print(e)
-            logger.info(f"Error fetching from {url}. Retrying...")
-            time.sleep(1)
+            logger.warning(f"Error fetching from {url}: {e}")
+            # no point in waiting after the last attempt
+            if i < max_retries - 1:
+                time.sleep(min(2**i, 30))
     else:
         exception = RetryLimitExceededException(f"Too many retries for {url}")
 
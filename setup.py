@@ -26,7 +26,6 @@ test_dependencies = [
     "types-PyYAML",
     "types-requests",
     "types-six",
-    "types-toml",
 ]
 
 extras = {
@@ -62,7 +61,7 @@ setup(
         "jinja2",
         "pytz",
         "requests",
-        "toml",
+        "tomli; python_version < '3.11'",
         "mozilla-metric-config-parser",
     ],
     include_package_data=True,